@@ -48,6 +48,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const progressStatus = taskDiv.querySelector('.progress-status');
 
     let pollingInterval = null;
+    let socket = null;
 
     detectBtn.addEventListener('click', async () => {
       const url = urlInput.value;
@@ -76,48 +77,90 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         const { job_id } = await startResponse.json();
 
-        pollingInterval = setInterval(async () => {
-          try {
-            const resultResponse = await fetch(`http://127.0.0.1:5000/results/${job_id}`);
-            if (!resultResponse.ok) throw new Error("Failed to fetch job status.");
-            const data = await resultResponse.json();
-            const { percentage, message } = data.progress;
-            progressStatus.textContent = message || 'Processing...';
-            progressBar.style.width = `${percentage || 5}%`;
+        let finished = false;
 
-            if (data.status === 'complete' || data.status === 'error') {
-              clearInterval(pollingInterval);
-              pollingInterval = null;
-              
-              if (data.status === 'complete') {
-                progressBar.style.width = '100%';
-                progressStatus.textContent = 'Analysis Complete!';
-                handleSuccess(data.result);
-                fetchPastResults();
+        const stopUpdates = () => {
+          finished = true;
+          if (pollingInterval) {
+            clearInterval(pollingInterval);
+            pollingInterval = null;
+          }
+          if (socket) {
+            socket.onclose = null;
+            socket.close();
+            socket = null;
+          }
+        };
+
+        const showError = (err) => {
+          stopUpdates();
+          progressStatus.textContent = `Error: ${err.message}`;
+          progressStatus.style.color = 'red';
+          
+          // Re-enable all buttons on error so the user can try again or delete
+          detectBtn.disabled = false;
+          urlInput.disabled = false;
+          deleteBtn.disabled = false;
+        };
 
-                // *** FIX: Automatically remove the completed task block after a short delay ***
-                setTimeout(() => {
-                    taskDiv.remove();
-                    updateAddTaskButtonState(); // Update the button state after removing
-                }, 2000); // Wait 2 seconds so the user can see the "Complete!" message
+        const handleJobUpdate = (data) => {
+          if (data.error) throw new Error(data.error);
+          const { percentage, message } = data.progress;
+          progressStatus.textContent = message || 'Processing...';
+          progressBar.style.width = `${percentage || 5}%`;
 
-              } else {
-                throw new Error(data.result || "Analysis failed.");
-              }
-              
+          if (data.status === 'complete' || data.status === 'error') {
+            stopUpdates();
+            
+            if (data.status === 'complete') {
+              progressBar.style.width = '100%';
+              progressStatus.textContent = 'Analysis Complete!';
+              handleSuccess(data.result);
+              fetchPastResults();
+
+              // *** FIX: Automatically remove the completed task block after a short delay ***
+              setTimeout(() => {
+                  taskDiv.remove();
+                  updateAddTaskButtonState(); // Update the button state after removing
+              }, 2000); // Wait 2 seconds so the user can see the "Complete!" message
+
+            } else {
+              throw new Error(data.result || "Analysis failed.");
             }
-          } catch (err) {
-            clearInterval(pollingInterval);
-            pollingInterval = null;
-            progressStatus.textContent = `Error: ${err.message}`;
-            progressStatus.style.color = 'red';
             
-            // Re-enable all buttons on error so the user can try again or delete
-            detectBtn.disabled = false;
-            urlInput.disabled = false;
-            deleteBtn.disabled = false;
           }
-        }, 2000);
+        };
+
+        const startPolling = () => {
+          pollingInterval = setInterval(async () => {
+            try {
+              const resultResponse = await fetch(`http://127.0.0.1:5000/results/${job_id}`);
+              if (!resultResponse.ok) throw new Error("Failed to fetch job status.");
+              handleJobUpdate(await resultResponse.json());
+            } catch (err) {
+              showError(err);
+            }
+          }, 2000);
+        };
+
+        // Progress is pushed over a WebSocket; fall back to polling if it can't be used
+        try {
+          socket = new WebSocket(`ws://127.0.0.1:5000/results/ws/${job_id}`);
+          socket.onmessage = (event) => {
+            try {
+              handleJobUpdate(JSON.parse(event.data));
+            } catch (err) {
+              showError(err);
+            }
+          };
+          socket.onclose = () => {
+            socket = null;
+            if (!finished) startPolling();
+          };
+        } catch (err) {
+          socket = null;
+          startPolling();
+        }
       } catch (err) {
         alert(`Error: ${err.message}`);
         detectBtn.disabled = false;
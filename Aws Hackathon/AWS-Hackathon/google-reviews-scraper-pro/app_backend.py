@@ -1,39 +1,138 @@
-import uuid
+import asyncio
+import functools
+import os
 import threading
+import uuid
 import logging
 import random
 import time
-import json
-from pathlib import Path
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+import uvicorn
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+import orjson
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from pydantic import BaseModel
+from modules.models import RawReview
 from modules.scraper import GoogleReviewsScraper
-from modules.s3_handler import S3Handler
+from modules.s3_handler import S3Handler, MAX_DELETE_KEYS
 from modules.config import load_config
-from dataclasses import asdict
-import re
+from modules.job_store import JobStore
+from modules.browser_pool import BrowserPool
+from dataclasses import fields
 
-app = Flask(__name__)
+app = FastAPI()
 
 # --- Explicit and robust CORS setup ---
-CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True, allow_headers="*")
-app.config['CORS_AUTOMATIC_OPTIONS'] = True
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-jobs = {}
+# Each scrape drives its own Chrome process, so cap how many run at once; extra jobs wait in the queue
+SCRAPER_WORKERS = int(os.environ.get('SCRAPER_WORKERS', 2))
+EXECUTOR = ThreadPoolExecutor(max_workers=SCRAPER_WORKERS)
+# Chrome instances launched ahead of time and reused by scrape jobs (BROWSER_POOL=0 launches one per job)
+BROWSER_POOL_SIZE = int(os.environ.get('BROWSER_POOL', SCRAPER_WORKERS))
+BROWSER_POOL = BrowserPool(BROWSER_POOL_SIZE) if BROWSER_POOL_SIZE > 0 else None
+# How often the results WebSocket checks the job store for progress changes
+WS_POLL_INTERVAL = 0.25
+# Drops characters that are unsafe in S3 keys / filenames and turns spaces into underscores
+_SANITIZE = str.maketrans({c: None for c in '\\/*?:"<>|'} | {' ': '_'})
+# RawReview is flat, so a plain field copy replaces the recursive deep copy done by dataclasses.asdict
+_REVIEW_FIELDS = tuple(f.name for f in fields(RawReview))
+# Load config and create the S3 handler once per process; it connects on first use and retries
+# on later requests if that fails, so importing the app never blocks on S3
+CONFIG = load_config()
+S3 = S3Handler(CONFIG, validate=False)
+# Job state lives in Redis when enabled, so several Uvicorn workers can serve /results
+JOBS = JobStore(CONFIG)
+# Short-lived cache of S3 report listings, keyed by prefix, so UI refreshes don't each hit S3 LIST
+_past_results_cache = TTLCache(maxsize=8, ttl=60)
+# Guards the cache for both the cached lookups and invalidations; TTLCache itself is not thread-safe
+_past_results_lock = threading.Lock()
+# Part of the cache key and bumped on every invalidation, so a listing that started before an upload
+# or delete is stored under a key no later lookup uses
+_past_results_generation = 0
+
+
+# --- Request / response models ---
+class DetectRequest(BaseModel):
+    url: str = ""
+
+
+class DeleteRequest(BaseModel):
+    key: str = ""              # single report (original schema)
+    keys: List[str] = []       # several reports in one request
+
+
+class JobCreated(BaseModel):
+    job_id: str
+
+
+class JobProgress(BaseModel):
+    percentage: int = 0
+    message: str = ""
+
+
+class JobStatus(BaseModel):
+    status: str
+    progress: JobProgress
+    result: Any = None
+    s3_url: Optional[str] = None
+    s3_key: Optional[str] = None
+
+
+class PastResult(BaseModel):
+    name: str
+    date: str
+    key: str       # keep old
+    s3_key: str    # 🔥 new, so frontend never gets undefined
+
+
+class Message(BaseModel):
+    message: str
+
+
+def ojson(obj: Any, status_code: int = 200) -> Response:
+    """ Encode a response body with orjson in one step, skipping FastAPI's validate-then-encode path. """
+    return Response(content=orjson.dumps(obj), status_code=status_code, media_type="application/json")
+
+
+def error_response(message: str, status_code: int) -> Response:
+    return ojson({"error": message}, status_code)
+
+
+def invalidate_past_results():
+    """ Drop cached report listings after reports are added or deleted. """
+    global _past_results_generation
+    with _past_results_lock:
+        _past_results_generation += 1
+        _past_results_cache.clear()
+
 
 def run_scraper_task(job_id: str, url: str):
     """ Main background task for scraping and analysis. """
     logging.info(f"[{job_id}] Starting background task for URL: {url}")
-    job_info = jobs[job_id]
-    config = load_config()
+    job_info = JOBS.open(job_id)
+    if job_info is None:
+        logging.error(f"[{job_id}] Job state expired or was evicted before the task started; skipping.")
+        return
+    config = CONFIG
 
     try:
         job_info['status'] = 'running'
         job_info['progress']['percentage'] = 5
         job_info['progress']['message'] = 'Initializing scraper...'
         scraper_config = {"url": url, "headless": True, "sort_by": "relevance"}
-        scraper = GoogleReviewsScraper(scraper_config)
+        scraper = GoogleReviewsScraper(scraper_config, browser_pool=BROWSER_POOL)
         scraped_data = scraper.scrape(job_info=job_info)
 
         if not scraped_data:
@@ -46,9 +145,11 @@ def run_scraper_task(job_id: str, url: str):
         time.sleep(1.5)
 
         reviews_objects = scraped_data.get("reviews", [])
-        final_reviews_as_dicts = [asdict(r) for r in reviews_objects]
-        for review in final_reviews_as_dicts:
+        final_reviews_as_dicts = []
+        for r in reviews_objects:
+            review = {k: getattr(r, k) for k in _REVIEW_FIELDS}
             review['prediction'] = random.choice(["Fake", "Genuine"])
+            final_reviews_as_dicts.append(review)
 
         final_result = {
             "company_name": scraped_data.get("company_name", "Unknown"),
@@ -57,26 +158,22 @@ def run_scraper_task(job_id: str, url: str):
         job_info['result'] = final_result
         logging.info(f"[{job_id}] Analysis complete.")
 
-        s3_handler = S3Handler(config)
-        if s3_handler.enabled:
+        s3_handler = S3
+        if s3_handler.ensure_ready():
             s3_config = config.get("s3", {})
             company_name = final_result.get("company_name", "Unknown_Company")
-            safe_filename = re.sub(r'[\\/*?:"<>|]', "", company_name).replace(" ", "_")
+            safe_filename = company_name.translate(_SANITIZE)
             s3_prefix = s3_config.get("prefix", "google-maps-data/")
             reports_folder = s3_config.get("reports_folder", "json-reports/")
             s3_key = f"{s3_prefix}{reports_folder}{safe_filename}_{job_id[:8]}.json"
-            
-            local_path = Path(f"{job_id}.json")
-            with open(local_path, 'w', encoding='utf-8') as f:
-                json.dump(final_result, f, ensure_ascii=False, indent=4)
 
-            s3_url = s3_handler.upload_json_file(local_path, s3_key)
+            s3_url = s3_handler.put_json_bytes(final_result, s3_key)
             if s3_url:
                 job_info['s3_url'] = s3_url
                 job_info['s3_key'] = s3_key   # 🔥 Save key for frontend
                 logging.info(f"[{job_id}] Successfully uploaded report to S3: {s3_url}")
-            local_path.unlink()
-        
+                invalidate_past_results()
+
         job_info['status'] = 'complete'
         job_info['progress']['percentage'] = 100
         job_info['progress']['message'] = 'Done!'
@@ -86,82 +183,128 @@ def run_scraper_task(job_id: str, url: str):
         job_info['status'] = 'error'
         job_info['result'] = str(e)
 
-@app.route("/detect", methods=["POST"])
-def detect_endpoint():
-    data = request.get_json()
-    if not data or 'url' not in data or not data['url'].startswith("http"):
-        return jsonify({"error": "A valid 'url' is required"}), 400
-    url = data["url"]
-    job_id = str(uuid.uuid4())
-    jobs[job_id] = {
+
+def log_task_failure(job_id: str, future: asyncio.Future):
+    """ Done-callback for scrape tasks: report errors that escaped run_scraper_task's own handler. """
+    if not future.cancelled() and (exc := future.exception()):
+        logging.error(f"[{job_id}] Background task failed: {exc}", exc_info=exc)
+
+
+@cached(_past_results_cache, key=lambda prefix: hashkey(prefix, _past_results_generation), lock=_past_results_lock)
+def _list_reports(prefix: str) -> List[dict]:
+    """ List saved JSON reports under `prefix`, newest first. """
+    s3_handler = S3
+    # A single list_objects_v2 call stops at 1000 keys, so walk every page
+    paginator = s3_handler.s3_client.get_paginator('list_objects_v2')
+    pages = paginator.paginate(
+        Bucket=s3_handler.bucket_name,
+        Prefix=prefix.rstrip('/') + '/',
+        PaginationConfig={'PageSize': 1000}
+    )
+    contents = []
+    for page in pages:
+        contents.extend(page.get('Contents', []))
+
+    results = []
+    for obj in sorted(contents, key=lambda x: x['LastModified'], reverse=True):
+        key = obj['Key']
+        filename = key.split('/')[-1]
+        if not filename: continue
+        company_name = filename.rsplit('_', 1)[0].replace('_', ' ')
+        results.append({
+            "name": company_name,
+            "date": obj['LastModified'].isoformat(),
+            "key": key,
+            "s3_key": key
+        })
+    return results
+
+
+@app.post("/detect", response_model=JobCreated)
+async def detect_endpoint(data: Optional[DetectRequest] = None):
+    if not data or not data.url.startswith("http"):
+        return error_response("A valid 'url' is required", 400)
+    url = data.url
+    job_id = uuid.uuid4().hex
+    JOBS.save(job_id, {
         'status': 'pending',
         'progress': {'percentage': 0, 'message': 'Job is queued...'},
         'result': None
-    }
-    thread = threading.Thread(target=run_scraper_task, args=(job_id, url))
-    thread.start()
+    })
+    # Selenium is blocking, so run the scraper on the worker pool and keep the event loop free
+    task = asyncio.get_running_loop().run_in_executor(EXECUTOR, run_scraper_task, job_id, url)
+    task.add_done_callback(functools.partial(log_task_failure, job_id))
     logging.info(f"[{job_id}] Job created for URL: {url}")
-    return jsonify({"job_id": job_id})
+    return ojson({"job_id": job_id})
 
-@app.route("/results/<job_id>", methods=["GET"])
-def get_results_endpoint(job_id):
-    job = jobs.get(job_id)
+@app.get("/results/{job_id}", response_model=JobStatus)
+async def get_results_endpoint(job_id: str):
+    job = await asyncio.to_thread(JOBS.get, job_id)
     if not job:
-        return jsonify({"error": "Job not found"}), 404
-    return jsonify(job)
-
-@app.route("/past_results", methods=["GET"])
-def get_past_results():
-    config = load_config()
-    s3_handler = S3Handler(config)
-    if not s3_handler.enabled:
-        return jsonify({"error": "S3 is not configured."}), 500
+        return error_response("Job not found", 404)
+    return ojson(job)
+
+@app.websocket("/results/ws/{job_id}")
+async def job_progress_socket(websocket: WebSocket, job_id: str):
+    """ Push job state to the client whenever it changes, until the job finishes. """
+    await websocket.accept()
+    last_sent = None
+    try:
+        while True:
+            job = await asyncio.to_thread(JOBS.get, job_id)
+            if not job:
+                await websocket.send_text(orjson.dumps({"error": "Job not found"}).decode())
+                break
+            # Snapshot the state so in-place updates by the scraper are detected
+            snapshot = orjson.dumps(job)
+            if snapshot != last_sent:
+                await websocket.send_text(snapshot.decode())
+                last_sent = snapshot
+            if job['status'] in ('complete', 'error'):
+                break
+            await asyncio.sleep(WS_POLL_INTERVAL)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logging.info(f"[{job_id}] Progress socket closed by client.")
+
+@app.get("/past_results", response_model=List[PastResult])
+async def get_past_results():
+    config = CONFIG
+    s3_handler = S3
+    if not await asyncio.to_thread(s3_handler.ensure_ready):
+        return error_response("S3 is not configured.", 500)
     try:
         s3_config = config.get("s3", {})
         prefix = f"{s3_config.get('prefix', 'google-maps-data/')}{s3_config.get('reports_folder', 'json-reports/')}"
-        response = s3_handler.s3_client.list_objects_v2(Bucket=s3_handler.bucket_name, Prefix=prefix)
-        if 'Contents' not in response:
-            return jsonify([])
-        results = []
-        for obj in sorted(response['Contents'], key=lambda x: x['LastModified'], reverse=True):
-            key = obj['Key']
-            filename = key.split('/')[-1]
-            if not filename: continue
-            company_name = filename.rsplit('_', 1)[0].replace('_', ' ')
-            results.append({
-                "name": company_name,
-                "date": obj['LastModified'].isoformat(),
-                "key": key,       # keep old
-                "s3_key": key     # 🔥 new, so frontend never gets undefined
-            })
-        return jsonify(results)
+        return ojson(await asyncio.to_thread(_list_reports, prefix))
     except Exception as e:
         logging.error(f"Failed to fetch past results from S3: {e}", exc_info=True)
-        return jsonify({"error": "Could not retrieve past results from S3."}), 500
+        return error_response("Could not retrieve past results from S3.", 500)
 
 # --- FIXED DELETE ENDPOINT ---
-@app.route("/delete_report", methods=["POST", "DELETE"])
-def delete_report():
-    if request.method == "OPTIONS":
-        return jsonify({"message": "Preflight OK"}), 200
-
-    data = request.get_json()
-    s3_key = data.get('key') if data else None
-    if not s3_key:
-        return jsonify({"error": "S3 key is required."}), 400
+# CORS preflight (OPTIONS) requests are answered by CORSMiddleware.
+@app.api_route("/delete_report", methods=["POST", "DELETE"], response_model=Message)
+async def delete_report(data: Optional[DeleteRequest] = None):
+    s3_keys = list(dict.fromkeys(data.keys or ([data.key] if data.key else []))) if data else []
+    if not s3_keys:
+        return error_response("S3 key is required.", 400)
 
-    config = load_config()
-    s3_handler = S3Handler(config)
-    if not s3_handler.enabled:
-        return jsonify({"error": "S3 is not configured."}), 500
+    s3_handler = S3
+    if not await asyncio.to_thread(s3_handler.ensure_ready):
+        return error_response("S3 is not configured.", 500)
 
-    try:
-        s3_handler.s3_client.delete_object(Bucket=s3_handler.bucket_name, Key=s3_key)
-        logging.info(f"Successfully deleted report from S3: {s3_key}")
-        return jsonify({"message": "Report deleted successfully."})
-    except Exception as e:
-        logging.error(f"Failed to delete report from S3: {e}", exc_info=True)
-        return jsonify({"error": "Could not delete the report from S3."}), 500
+    # DeleteObjects takes at most 1000 keys, so send larger requests as concurrent batches
+    batches = [s3_keys[i:i + MAX_DELETE_KEYS] for i in range(0, len(s3_keys), MAX_DELETE_KEYS)]
+    results = await asyncio.gather(*(asyncio.to_thread(s3_handler.delete_objects, batch) for batch in batches))
+    invalidate_past_results()
+    failed = [key for batch_failed in results for key in batch_failed]
+    if failed:
+        logging.error(f"Failed to delete {len(failed)} of {len(s3_keys)} reports from S3: {failed}")
+        return error_response("Could not delete the report from S3.", 500)
+    logging.info(f"Successfully deleted {len(s3_keys)} report(s) from S3: {s3_keys}")
+    return ojson({"message": "Report deleted successfully."})
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True, threaded=True, use_reloader=False)
+    # For production, serve with: uvicorn app_backend:app --host 0.0.0.0 --port 5000 --loop uvloop
+    # Job state is per-process unless use_redis is enabled, so keep a single worker without Redis.
+    uvicorn.run(app, host="0.0.0.0", port=5000)
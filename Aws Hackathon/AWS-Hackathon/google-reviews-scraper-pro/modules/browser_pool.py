@@ -0,0 +1,123 @@
+"""
+Chrome driver creation and a pool of pre-launched drivers for the web backend.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+
+import undetected_chromedriver as uc
+from selenium.webdriver import Chrome
+
+log = logging.getLogger("scraper")
+
+
+def create_driver(headless: bool = True) -> Chrome:
+    """Launch a new Chrome driver instance."""
+    log.info("Setting up Chrome driver (headless=%s)...", headless)
+    opts = uc.ChromeOptions()
+    opts.add_argument("--window-size=1400,900")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    if headless:
+        opts.add_argument("--headless=new")
+
+    driver = uc.Chrome(options=opts)
+    driver.set_page_load_timeout(45)
+    log.info("Chrome driver started successfully.")
+    return driver
+
+
+def _quit(driver: Optional[Chrome]):
+    """Quit a driver, ignoring errors from browsers that already died."""
+    if driver:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def is_alive(driver: Chrome) -> bool:
+    """True if the driver's browser session still answers commands."""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of Chrome drivers so scrape jobs don't pay Chrome's startup cost.
+
+    The queue always holds `size` slots; a slot is either a ready driver or None
+    (a driver still to be launched). A supervisor thread launches missing drivers
+    and replaces ones that have crashed while idle.
+    """
+
+    def __init__(self, size: int, headless: bool = True, supervise_interval: float = 30.0):
+        self.size = size
+        self.headless = headless
+        self.supervise_interval = supervise_interval
+        self._slots = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._slots.put(None)
+
+        # The first supervisor pass pre-launches the drivers without blocking startup
+        self._supervisor = threading.Thread(target=self._supervise, name="browser-pool", daemon=True)
+        self._supervisor.start()
+
+    def _launch(self) -> Optional[Chrome]:
+        try:
+            return create_driver(self.headless)
+        except Exception as e:
+            log.error("Failed to start pooled Chrome driver: %s", e, exc_info=True)
+            return None
+
+    def acquire(self, timeout: float = 60) -> Optional[Chrome]:
+        """
+        Check out a driver, launching one if its slot is empty.
+        Returns None if no slot frees up within `timeout` or Chrome fails to start.
+        """
+        try:
+            driver = self._slots.get(timeout=timeout)
+        except queue.Empty:
+            log.error("No pooled Chrome driver became available within %ss", timeout)
+            return None
+
+        if driver is None or not is_alive(driver):
+            _quit(driver)
+            driver = self._launch()
+            if driver is None:
+                self._slots.put(None)
+        return driver
+
+    def release(self, driver: Chrome):
+        """Reset a driver's session state and return it to the pool."""
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except Exception as e:
+            log.warning("Could not reset pooled Chrome driver, it will be replaced: %s", e)
+            _quit(driver)
+            driver = None
+        self._slots.put(driver)
+
+    def discard(self, driver: Optional[Chrome]):
+        """Quit a broken driver and free its slot for a replacement."""
+        _quit(driver)
+        self._slots.put(None)
+
+    def _supervise(self):
+        while True:
+            for _ in range(self._slots.qsize()):
+                try:
+                    driver = self._slots.get_nowait()
+                except queue.Empty:
+                    break
+                if driver is None or not is_alive(driver):
+                    _quit(driver)
+                    driver = self._launch()
+                self._slots.put(driver)
+            time.sleep(self.supervise_interval)
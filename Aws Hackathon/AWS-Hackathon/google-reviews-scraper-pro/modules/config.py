@@ -3,9 +3,12 @@ Configuration management for the Google Maps Reviews Scraper.
 This file can be overridden by a local config.yaml file.
 """
 
+import copy
+import functools
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Mapping
 import os
 import yaml
 
@@ -42,6 +45,13 @@ DEFAULT_CONFIG = {
         "collection": "google_reviews"
     },
     
+    # Redis settings (job state store for the web backend; in-memory when disabled)
+    "use_redis": False,
+    "redis": {
+        "url": "redis://localhost:6379/0",
+        "job_ttl": 3600 # Seconds before finished or abandoned jobs expire
+    },
+    
     # JSON backup settings
     "backup_to_json": True,
     "json_path": "google_reviews.json",
@@ -71,12 +81,44 @@ DEFAULT_CONFIG = {
 }
 
 # --- Configuration Loading Function ---
-def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
+def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> Mapping[str, Any]:
     """
     Load configuration from a YAML file or use defaults.
+    The parsed result is cached until the file's modification time changes,
+    and is returned read-only at every level; use thaw_config for a mutable copy.
+    """
+    config_path = Path(config_path)
+    mtime = config_path.stat().st_mtime if config_path.exists() else 0
+    return _load_config_cached(config_path, mtime)
+
+
+def thaw_config(config: Mapping[str, Any]) -> dict:
+    """Return a mutable deep copy of a config returned by load_config."""
+    def thaw(value):
+        if isinstance(value, Mapping):
+            return {k: thaw(v) for k, v in value.items()}
+        if isinstance(value, tuple):
+            return [thaw(v) for v in value]
+        return value
+    return thaw(config)
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(config_path: Path, mtime: float) -> Mapping[str, Any]:
+    """
+    Parse the YAML file and merge it over the defaults.
     Includes a helper function for deep merging dictionaries.
     """
-    config = DEFAULT_CONFIG.copy()
+    config = copy.deepcopy(DEFAULT_CONFIG)
 
     # Helper function to recursively merge dictionaries
     def deep_update(d, u):
@@ -106,4 +148,4 @@ def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
         except Exception as e:
             log.error(f"Could not create default config file at {config_path}: {e}")
 
-    return config
+    return _freeze(config)
@@ -10,6 +10,12 @@ from typing import Dict, Any, Optional
 # Logger
 log = logging.getLogger("scraper")
 
+# Relative date patterns per language, compiled once for try_parse_date
+EN_AGO_RE = re.compile(r'(?P<num>a|an|\d+)\s+(?P<unit>day|week|month|year)s?\s+ago', re.IGNORECASE)
+HE_AGO_RE = re.compile(r'(?P<num>\d+|אחד|אחת)?\s*(?P<unit>שנה|שנים|חודש|חודשים|יום|ימים|שבוע|שבועות)',
+                       re.IGNORECASE)
+TH_AGO_RE = re.compile(r'(?P<num>\d+)?\s*(?P<unit>วัน|สัปดาห์|เดือน|ปี)ที่แล้ว', re.IGNORECASE)
+
 
 def relative_to_datetime(date_str: str, lang: str = "en") -> Optional[datetime]:
     """
@@ -165,8 +171,7 @@ def try_parse_date(date_str: str, lang: str, now: datetime) -> str:
 
     if lang.lower() == "en":
         # Pattern: capture number or "a"/"an", then unit.
-        pattern = re.compile(r'(?P<num>a|an|\d+)\s+(?P<unit>day|week|month|year)s?\s+ago', re.IGNORECASE)
-        m = pattern.search(date_str)
+        m = EN_AGO_RE.search(date_str)
         if m:
             num_str = m.group("num").lower()
             num = 1 if num_str in ("a", "an") else int(num_str)
@@ -203,9 +208,7 @@ def try_parse_date(date_str: str, lang: str, now: datetime) -> str:
             parsed = True
         else:
             # Match optional number (or assume 1) and then a unit.
-            pattern = re.compile(r'(?P<num>\d+|אחד|אחת)?\s*(?P<unit>שנה|שנים|חודש|חודשים|יום|ימים|שבוע|שבועות)',
-                                 re.IGNORECASE)
-            m = pattern.search(text)
+            m = HE_AGO_RE.search(text)
             if m:
                 num_str = m.group("num")
                 if not num_str:
@@ -240,8 +243,7 @@ def try_parse_date(date_str: str, lang: str, now: datetime) -> str:
     elif lang.lower() == "th":
         # Thai language patterns (simplified)
         # Check for Thai patterns like "3 วันที่แล้ว" (3 days ago)
-        thai_pattern = re.compile(r'(?P<num>\d+)?\s*(?P<unit>วัน|สัปดาห์|เดือน|ปี)ที่แล้ว', re.IGNORECASE)
-        m = thai_pattern.search(date_str)
+        m = TH_AGO_RE.search(date_str)
         if m:
             num_str = m.group("num")
             num = 1 if not num_str else int(num_str)
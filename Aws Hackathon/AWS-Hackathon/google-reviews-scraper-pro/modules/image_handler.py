@@ -33,6 +33,12 @@ class ImageHandler:
         self.custom_url_reviews = config.get("custom_url_reviews", "/reviews/")
         self.preserve_original_urls = config.get("preserve_original_urls", True)
 
+        # One session for all downloads, with a connection pool sized for the download threads
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
         # Subdirectories for different image types
         self.profile_dir = self.image_dir / "profiles"
         self.review_dir = self.image_dir / "reviews"
@@ -135,7 +141,7 @@ class ImageHandler:
 
             # Download the image
             url = url.split("=")[0]
-            response = requests.get(url, stream=True, timeout=10)
+            response = self.session.get(url, stream=True, timeout=10)
             response.raise_for_status()
 
             with open(filepath, 'wb') as f:
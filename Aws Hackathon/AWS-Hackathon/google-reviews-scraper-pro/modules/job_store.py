@@ -0,0 +1,97 @@
+"""
+Job state storage for the web backend.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+import orjson
+import redis
+from cachetools import TTLCache
+
+log = logging.getLogger("scraper")
+
+
+class JobStore:
+    """Store for scrape job state, backed by Redis or an in-process TTL cache"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize job store with configuration"""
+        redis_config = config.get("redis", {})
+        self.ttl = redis_config.get("job_ttl", 3600)
+        self.enabled = config.get("use_redis", False)
+        self.client = None
+        # Fallback for single-process deployments; entries still expire after `ttl` seconds.
+        # TTLCache is not thread-safe and is shared by the scraper and request threads, so guard it.
+        self._local = TTLCache(maxsize=1024, ttl=self.ttl)
+        self._local_lock = threading.Lock()
+
+        if not self.enabled:
+            return
+
+        try:
+            self.client = redis.Redis.from_url(redis_config.get("url", "redis://localhost:6379/0"))
+            self.client.ping()
+            log.info("Job store connected to Redis")
+        except Exception as e:
+            log.error(f"Error connecting to Redis, keeping job state in memory: {e}")
+            self.client = None
+            self.enabled = False
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def save(self, job_id: str, job: Dict[str, Any]):
+        """Write the full job state, resetting its expiry"""
+        if self.enabled:
+            self.client.set(self._key(job_id), orjson.dumps(job), ex=self.ttl)
+        else:
+            with self._local_lock:
+                self._local[job_id] = job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job state, or None if it is unknown or expired"""
+        if self.enabled:
+            raw = self.client.get(self._key(job_id))
+            return orjson.loads(raw) if raw else None
+        with self._local_lock:
+            return self._local.get(job_id)
+
+    def open(self, job_id: str) -> Optional["TrackedJob"]:
+        """Load a job for in-place updates that are written back to the store"""
+        job = self.get(job_id)
+        return TrackedJob(self, job_id, job) if job is not None else None
+
+
+class TrackedJob(dict):
+    """
+    Job state dict that saves itself to its JobStore whenever a key
+    (or a key of its 'progress' dict) is assigned.
+    """
+
+    def __init__(self, store: JobStore, job_id: str, job: Dict[str, Any]):
+        super().__init__(job)
+        self._store = store
+        self._job_id = job_id
+        super().__setitem__('progress', _TrackedProgress(self, job.get('progress') or {}))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.save()
+
+    def save(self):
+        self._store.save(self._job_id, self)
+
+
+class _TrackedProgress(dict):
+    """Progress sub-dict that saves its parent job on assignment"""
+
+    def __init__(self, job: TrackedJob, progress: Dict[str, Any]):
+        super().__init__(progress)
+        self._job = job
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._job.save()
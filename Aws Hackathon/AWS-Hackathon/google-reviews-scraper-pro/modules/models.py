@@ -3,10 +3,14 @@ Data models for Google Maps Reviews Scraper.
 """
 import re
 from dataclasses import dataclass, field
+from datetime import datetime
 
-from selenium.webdriver.remote.webelement import WebElement
+from bs4 import BeautifulSoup
 
-from modules.utils import (try_find, first_text, first_attr, safe_int, detect_lang, parse_date_to_iso)
+from modules.utils import safe_int, detect_lang, parse_date_to_iso, html_first_text, html_first_attr
+
+RATING_RE = re.compile(r"[\d\.]+")
+PHOTO_URL_RE = re.compile(r'url\("([^"]+)"')
 
 
 @dataclass
@@ -38,50 +42,47 @@ class RawReview:
     OWNER_RESP = "div.CDe7pd"
 
     @classmethod
-    def from_card(cls, card: WebElement) -> "RawReview":
-        """Factory method to create a RawReview from a WebElement"""
-        # expand "More" - non-blocking approach
-        for b in try_find(card, cls.MORE_BTN, all=True):
-            try:
-                b.click()
-            except Exception:
-                pass
+    def from_card_html(cls, html: str, now: datetime | None = None) -> "RawReview":
+        """
+        Factory method to create a RawReview from a card's outerHTML.
+        Parsing happens locally, so no WebDriver round-trips are made.
+        "More" buttons must already have been expanded in the browser.
+        """
+        card = BeautifulSoup(html, "html.parser").find()
 
-        rid = card.get_attribute("data-review-id") or ""
-        author = first_text(card, 'div[class*="d4r55"]')
-        profile = first_attr(card, 'button[data-review-id]', "data-href")
-        avatar = first_attr(card, 'button[data-review-id] img', "src")
+        rid = card.get("data-review-id") or ""
+        author = html_first_text(card, 'div[class*="d4r55"]')
+        profile = html_first_attr(card, 'button[data-review-id]', "data-href")
+        avatar = html_first_attr(card, 'button[data-review-id] img', "src")
 
-        label = first_attr(card, 'span[role="img"]', "aria-label")
-        num = re.search(r"[\d\.]+", label.replace(",", ".")) if label else None
+        label = html_first_attr(card, 'span[role="img"]', "aria-label")
+        num = RATING_RE.search(label.replace(",", ".")) if label else None
         rating = float(num.group()) if num else 0.0
 
-        date = first_text(card, 'span[class*="rsqaWe"]')
-        # Parse the date string to ISO format
-        review_date = parse_date_to_iso(date)
+        date = html_first_text(card, 'span[class*="rsqaWe"]')
+        review_date = parse_date_to_iso(date, now)
 
         text = ""
         for sel in ('span[jsname="bN97Pc"]',
                     'span[jsname="fbQN7e"]',
                     'div.MyEned span.wiI7pd'):
-            text = first_text(card, sel)
+            text = html_first_text(card, sel)
             if text: break
         lang = detect_lang(text)
 
         likes = 0
-        if (btn := try_find(card, cls.LIKE_BTN)):
-            likes = safe_int(btn[0].text or btn[0].get_attribute("aria-label"))
+        if (btn := card.select_one(cls.LIKE_BTN)):
+            likes = safe_int(btn.get_text().strip() or btn.get("aria-label"))
 
         photos: list[str] = []
-        for btn in try_find(card, cls.PHOTO_BTN, all=True):
-            if (m := re.search(r'url\("([^"]+)"', btn.get_attribute("style") or "")):
+        for btn in card.select(cls.PHOTO_BTN):
+            if (m := PHOTO_URL_RE.search(btn.get("style") or "")):
                 photos.append(m.group(1))
 
         owner_date = owner_text = ""
-        if (box := try_find(card, cls.OWNER_RESP)):
-            box = box[0]
-            owner_date = first_text(box, "span.DZSIDd")
-            owner_text = first_text(box, "div.wiI7pd")
+        if (box := card.select_one(cls.OWNER_RESP)):
+            owner_date = html_first_text(box, "span.DZSIDd")
+            owner_text = html_first_text(box, "div.wiI7pd")
 
         return cls(rid, author, rating, date, lang, text, likes,
                    photos, profile, avatar, owner_date, owner_text, review_date)
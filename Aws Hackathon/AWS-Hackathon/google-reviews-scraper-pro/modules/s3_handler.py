@@ -2,23 +2,41 @@
 S3 upload handler for Google Maps Reviews Scraper.
 """
 
+import gzip
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 import boto3
+import orjson
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 
 log = logging.getLogger("scraper")
 
+# Files up to this size are sent as a single PUT without the transfer manager's thread pool
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+SMALL_TRANSFER = TransferConfig(multipart_threshold=64 * 1024 * 1024, use_threads=False)
+# Largest number of keys a single DeleteObjects request accepts
+MAX_DELETE_KEYS = 1000
+
 
 class S3Handler:
     """Handler for uploading images to AWS S3"""
 
-    def __init__(self, config: Dict[str, Any]):
-        """Initialize S3 handler with configuration"""
+    def __init__(self, config: Dict[str, Any], validate: bool = True):
+        """
+        Initialize S3 handler with configuration.
+        With validate=False the client is created and the bucket checked on first use
+        (see ensure_ready) instead of here, and failed checks are retried on later calls.
+        """
         self.enabled = config.get("use_s3", False)
+        self.s3_client = None
+        self._ready = False
+        self._connect_lock = threading.Lock()
         
         if not self.enabled:
             return
@@ -34,14 +52,19 @@ class S3Handler:
         self.reviews_folder = s3_config.get("reviews_folder", "reviews/").strip("/")
         self.delete_local_after_upload = s3_config.get("delete_local_after_upload", False)
         self.s3_base_url = s3_config.get("s3_base_url", "")
+        self.upload_threads = s3_config.get("upload_threads", 16)  # Concurrent uploads in upload_images_batch
         
         # Validate required settings
         if not self.bucket_name:
             log.error("S3 bucket_name is required when use_s3 is enabled")
             self.enabled = False
             return
-            
-        # Initialize S3 client
+
+        if validate:
+            self.enabled = self._connect()
+
+    def _connect(self) -> bool:
+        """Create the S3 client and check the bucket is reachable; returns False (and logs) on failure"""
         try:
             session_kwargs = {"region_name": self.region_name}
             
@@ -57,6 +80,8 @@ class S3Handler:
             # Test connection by checking if bucket exists
             self.s3_client.head_bucket(Bucket=self.bucket_name)
             log.info(f"S3 handler initialized successfully for bucket: {self.bucket_name}")
+            self._ready = True
+            return True
             
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', '')
@@ -66,11 +91,20 @@ class S3Handler:
                 log.error(f"Access denied to S3 bucket '{self.bucket_name}'")
             else:
                 log.error(f"Error connecting to S3: {e}")
-            self.enabled = False
+            return False
             
         except Exception as e:
             log.error(f"Error initializing S3 client: {e}")
-            self.enabled = False
+            return False
+
+    def ensure_ready(self) -> bool:
+        """True if S3 is enabled and connected, connecting first if that hasn't succeeded yet"""
+        if not self.enabled:
+            return False
+        if self._ready:
+            return True
+        with self._connect_lock:
+            return self._ready or self._connect()
 
     def get_s3_url(self, key: str) -> str:
         """Generate S3 URL for uploaded file"""
@@ -90,7 +124,7 @@ class S3Handler:
         Returns:
             S3 URL if successful, None if failed
         """
-        if not self.enabled:
+        if not self.ensure_ready():
             return None
             
         if not local_path.exists():
@@ -98,7 +132,8 @@ class S3Handler:
             return None
             
         try:
-            # Upload file
+            # Upload file; only large files go through the multipart/threaded transfer path
+            is_large = local_path.stat().st_size > LARGE_FILE_THRESHOLD
             self.s3_client.upload_file(
                 str(local_path),
                 self.bucket_name,
@@ -106,7 +141,8 @@ class S3Handler:
                 ExtraArgs={
                     'ContentType': 'image/jpeg',
                     'ACL': 'public-read'  # Make images publicly readable
-                }
+                },
+                Config=None if is_large else SMALL_TRANSFER
             )
             
             # Generate S3 URL
@@ -142,7 +178,7 @@ class S3Handler:
         Returns:
             S3 URL if successful, None if failed.
         """
-        if not self.enabled:
+        if not self.ensure_ready():
             return None
 
         if not local_path.exists():
@@ -151,14 +187,12 @@ class S3Handler:
 
         try:
             # Upload file with the correct content type for JSON
-            self.s3_client.upload_file(
-                str(local_path),
-                self.bucket_name,
-                s3_key,
-                ExtraArgs={
-                    'ContentType': 'application/json',
-                    'ACL': 'public-read'  # Make file publicly readable
-                }
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=local_path.read_bytes(),
+                ContentType='application/json',
+                ACL='public-read'  # Make file publicly readable
             )
 
             s3_url = self.get_s3_url(s3_key)
@@ -173,6 +207,42 @@ class S3Handler:
             return None
     # <--- METHOD FOR JSON UPLOAD END --->
 
+    def put_json_bytes(self, data: Dict[str, Any], s3_key: str) -> Optional[str]:
+        """
+        Serialize data to gzip-compressed JSON in memory and upload it to S3 without a local file.
+        The object is stored with Content-Encoding: gzip, so browsers decompress it transparently.
+
+        Args:
+            data: JSON-serializable data to upload.
+            s3_key: S3 key (path) for the uploaded object.
+
+        Returns:
+            S3 URL if successful, None if failed.
+        """
+        if not self.ensure_ready():
+            return None
+
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=gzip.compress(orjson.dumps(data), compresslevel=5),
+                ContentType='application/json',
+                ContentEncoding='gzip',
+                ACL='public-read'  # Make file publicly readable
+            )
+
+            s3_url = self.get_s3_url(s3_key)
+            log.info(f"Successfully uploaded data to {s3_url}")
+            return s3_url
+
+        except ClientError as e:
+            log.error(f"Failed to upload data to s3://{self.bucket_name}/{s3_key}: {e}")
+            return None
+        except Exception as e:
+            log.error(f"Unexpected error uploading data to s3://{self.bucket_name}/{s3_key}: {e}")
+            return None
+
     # <--- METHOD FOR .IDS UPLOAD START --->
     def upload_ids_file(self, local_path: Path, s3_key: str) -> Optional[str]:
         """
@@ -185,7 +255,7 @@ class S3Handler:
         Returns:
             S3 URL if successful, None if failed.
         """
-        if not self.enabled:
+        if not self.ensure_ready():
             return None
 
         if not local_path.exists():
@@ -194,14 +264,12 @@ class S3Handler:
 
         try:
             # Upload file with the correct content type for plain text
-            self.s3_client.upload_file(
-                str(local_path),
-                self.bucket_name,
-                s3_key,
-                ExtraArgs={
-                    'ContentType': 'text/plain',
-                    'ACL': 'public-read'  # Make file publicly readable
-                }
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=local_path.read_bytes(),
+                ContentType='text/plain',
+                ACL='public-read'  # Make file publicly readable
             )
 
             s3_url = self.get_s3_url(s3_key)
@@ -228,7 +296,7 @@ class S3Handler:
         Returns:
             S3 URL if successful, None if failed
         """
-        if not self.enabled:
+        if not self.ensure_ready():
             return None
             
         # Create S3 key with appropriate folder structure
@@ -247,17 +315,53 @@ class S3Handler:
         Returns:
             Dict mapping filename to S3 URL for successful uploads
         """
-        if not self.enabled:
+        if not self.ensure_ready():
             return {}
             
         results = {}
-        
-        for filename, (local_path, is_profile) in image_files.items():
-            s3_url = self.upload_image(local_path, filename, is_profile)
-            if s3_url:
-                results[filename] = s3_url
+
+        def upload(item):
+            filename, (local_path, is_profile) = item
+            return filename, self.upload_image(local_path, filename, is_profile)
+
+        # Uploads are network-bound and boto3 clients are thread-safe, so run them in parallel
+        with ThreadPoolExecutor(max_workers=self.upload_threads) as executor:
+            for filename, s3_url in executor.map(upload, image_files.items()):
+                if s3_url:
+                    results[filename] = s3_url
                 
         if results:
             log.info(f"Successfully uploaded {len(results)} images to S3")
             
-        return results
\ No newline at end of file
+        return results
+
+    def delete_objects(self, keys: List[str]) -> List[str]:
+        """
+        Delete up to MAX_DELETE_KEYS objects from S3 in a single request.
+
+        Args:
+            keys: S3 keys to delete
+
+        Returns:
+            Keys that could not be deleted (empty if all succeeded)
+        """
+        if not self.ensure_ready():
+            return list(keys)
+
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': k} for k in keys], 'Quiet': True}  # Quiet: only errors are returned
+            )
+            failed = [err['Key'] for err in response.get('Errors', [])]
+            for err in response.get('Errors', []):
+                log.error(f"Failed to delete s3://{self.bucket_name}/{err['Key']}: {err.get('Message')}")
+            log.info(f"Deleted {len(keys) - len(failed)} objects from S3")
+            return failed
+
+        except ClientError as e:
+            log.error(f"Failed to delete objects from S3: {e}")
+            return list(keys)
+        except Exception as e:
+            log.error(f"Unexpected error deleting objects from S3: {e}")
+            return list(keys)
\ No newline at end of file
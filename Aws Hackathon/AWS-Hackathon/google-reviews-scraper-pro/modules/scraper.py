@@ -4,11 +4,11 @@ Selenium scraping logic for Google Maps Reviews.
 import logging
 import re
 import time
-from typing import Dict, Any, List, Union
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Union
 
-import undetected_chromedriver as uc
-from selenium.common.exceptions import (TimeoutException, StaleElementReferenceException, WebDriverException,
-                                        NoSuchWindowException, NoSuchElementException)
+from selenium.common.exceptions import (TimeoutException, StaleElementReferenceException, NoSuchWindowException,
+                                        InvalidSessionIdException, SessionNotCreatedException)
 from selenium.webdriver import Chrome
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
@@ -18,7 +18,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from tqdm import tqdm
 
+from modules.browser_pool import BrowserPool, create_driver, is_alive
 from modules.models import RawReview
+from modules.utils import WAIT_POLL
 
 log = logging.getLogger("scraper")
 
@@ -30,40 +32,101 @@ MENU_ITEMS = 'div[role="menu"] [role="menuitem"], li[role="menuitem"]'
 COMPANY_NAME_SELECTORS = [
     'h1.fontHeadlineLarge', 'h1[aria-label]', 'div.fontTitleLarge.m6QErb'
 ]
+# One selector group matching any of the above, so a single wait covers them all
+COMPANY_NAME_SEL = ", ".join(COMPANY_NAME_SELECTORS)
+# Locator tuples built once for the waits below
+PANE_LOCATOR = (By.CSS_SELECTOR, PANE_SEL)
+COOKIE_LOCATOR = (By.CSS_SELECTOR, COOKIE_BTN)
+SORT_LOCATOR = (By.CSS_SELECTOR, SORT_BTN)
 REVIEW_WORDS = {"reviews", "review", "ratings", "rating"}
 
+# Clicks every "More" button inside cards not yet scraped (args: pane, seen ids, card selector, button selector)
+EXPAND_JS = """
+const seen = new Set(arguments[1]);
+const buttons = new Set();
+for (const card of arguments[0].querySelectorAll(arguments[2])) {
+  if (seen.has(card.getAttribute('data-review-id'))) continue;
+  card.querySelectorAll(arguments[3]).forEach(b => buttons.add(b));
+}
+buttons.forEach(b => b.click());
+"""
+# Returns {id, html} for each card not yet scraped, in one round-trip (args: pane, seen ids, card selector)
+EXTRACT_JS = """
+const seen = new Set(arguments[1]);
+const cards = [];
+for (const card of arguments[0].querySelectorAll(arguments[2])) {
+  const id = card.getAttribute('data-review-id');
+  if (!id || seen.has(id)) continue;
+  seen.add(id);
+  cards.push({id: id, html: card.outerHTML});
+}
+return cards;
+"""
+COUNT_JS = "return arguments[0].querySelectorAll(arguments[1]).length;"
+# Async script: resolves with the text of the first rendered, non-empty element matching arguments[0]
+# as soon as the DOM produces one, or with null after arguments[1] ms
+WAIT_TEXT_JS = """
+const [sel, timeout, done] = arguments;
+const read = () => {
+  // Skip hidden or empty matches, so they can't mask a visible one later in the document
+  for (const e of document.querySelectorAll(sel)) {
+    const text = e.getClientRects().length ? e.innerText.trim() : '';
+    if (text) return text;
+  }
+  return null;
+};
+const first = read();
+if (first) return done(first);
+const observer = new MutationObserver(() => {
+  const text = read();
+  if (text) { observer.disconnect(); clearTimeout(timer); done(text); }
+});
+const timer = setTimeout(() => { observer.disconnect(); done(null); }, timeout);
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true, attributes: true});
+"""
+# How long to wait for the company name to appear before falling back to the page title
+COMPANY_NAME_WAIT = 2.0
+# Longest wait for new cards after a scroll (the old fixed sleep), checked every SCROLL_POLL seconds
+SCROLL_WAIT = 1.5
+SCROLL_POLL = 0.15
+
 class GoogleReviewsScraper:
     """Main scraper class for Google Maps Reviews."""
 
-    def __init__(self, config: Dict[str, Any] = None, **kwargs):
+    def __init__(self, config: Dict[str, Any] = None, browser_pool: Optional[BrowserPool] = None, **kwargs):
         self.config = config or {}
         self.config.update(kwargs)
+        self.browser_pool = browser_pool
         self.driver: Union[Chrome, None] = None
         self.company_name = "Unknown Company"
 
     def _start_driver(self) -> bool:
-        """Initializes a new Chrome driver instance."""
+        """Checks out a driver from the browser pool, or initializes a new Chrome driver instance."""
+        if self.browser_pool:
+            self.driver = self.browser_pool.acquire()
+            return self.driver is not None
         try:
-            log.info("Setting up Chrome driver (headless=%s)...", self.config.get("headless", True))
-            opts = uc.ChromeOptions()
-            opts.add_argument("--window-size=1400,900")
-            opts.add_argument("--no-sandbox")
-            opts.add_argument("--disable-dev-shm-usage")
-            if self.config.get("headless", True):
-                opts.add_argument("--headless=new")
-            
-            self.driver = uc.Chrome(options=opts)
-            self.driver.set_page_load_timeout(45)
-            log.info("Chrome driver started successfully.")
+            self.driver = create_driver(self.config.get("headless", True))
             return True
         except Exception as e:
             log.error("Failed to start Chrome driver: %s", e, exc_info=True)
             self._quit_driver()
             return False
 
+    def _release_driver(self):
+        """Returns a healthy driver to the browser pool, or quits it when not pooled."""
+        if self.browser_pool and self.driver:
+            self.browser_pool.release(self.driver)
+            self.driver = None
+        else:
+            self._quit_driver()
+
     def _quit_driver(self):
-        """Safely quits the driver."""
-        if self.driver:
+        """Safely quits the driver (a pooled driver is discarded and replaced)."""
+        if self.driver and self.browser_pool:
+            self.browser_pool.discard(self.driver)
+            self.driver = None
+        elif self.driver:
             try:
                 self.driver.quit()
                 log.info("Chrome driver has been quit.")
@@ -74,84 +137,101 @@ class GoogleReviewsScraper:
 
     def scrape(self, job_info: dict = None):
         """Main scraper method."""
-        for attempt in range(3):
-            log.info(f"Scraping attempt {attempt + 1}/3...")
-            if not self._start_driver():
-                time.sleep(5)
-                continue
+        try:
+            for attempt in range(3):
+                log.info(f"Scraping attempt {attempt + 1}/3...")
+                if not self.driver and not self._start_driver():
+                    time.sleep(5)
+                    continue
 
-            try:
-                if job_info: job_info['progress']['percentage'] = 15
-                
-                self.driver.get(self.config.get("url"))
-                # --- STABILITY FIX ---
-                time.sleep(2) # Wait for initial page javascript to load
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
+                try:
+                    if job_info: job_info['progress']['percentage'] = 15
+                    
+                    self.driver.get(self.config.get("url"))
+                    # --- STABILITY FIX ---
+                    time.sleep(2) # Wait for initial page javascript to load
+                    WebDriverWait(self.driver, 20).until(
+                        EC.presence_of_element_located((By.TAG_NAME, "body"))
+                    )
 
-                self.company_name = self._get_company_name(self.driver, job_info)
-                self.dismiss_cookies(self.driver)
-                self.click_reviews_tab(self.driver, job_info)
-                self.set_sort(self.driver, self.config.get("sort_by", "relevance"))
-                
-                time.sleep(1.5) # Wait for reviews to load after clicking tab
+                    self.company_name = self._get_company_name(self.driver, job_info)
+                    self.dismiss_cookies(self.driver)
+                    self.click_reviews_tab(self.driver, job_info)
+                    self.set_sort(self.driver, self.config.get("sort_by", "relevance"))
+                    
+                    time.sleep(1.5) # Wait for reviews to load after clicking tab
 
-                pane = WebDriverWait(self.driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, PANE_SEL)))
-                docs, _ = self._scroll_and_extract_reviews(pane, job_info)
+                    pane = WebDriverWait(self.driver, 20).until(EC.presence_of_element_located(PANE_LOCATOR))
+                    docs, _ = self._scroll_and_extract_reviews(pane, job_info)
 
-                log.info("Scraping successful. Total unique reviews found: %d", len(docs))
-                return {"company_name": self.company_name, "reviews": list(docs.values())}
+                    log.info("Scraping successful. Total unique reviews found: %d", len(docs))
+                    return {"company_name": self.company_name, "reviews": list(docs.values())}
 
-            except Exception as e:
-                log.error(f"Attempt {attempt + 1} failed: {e}", exc_info=True)
-                self._quit_driver()
-                if attempt < 2: time.sleep(5)
-        
-        log.error("All scraping attempts have failed.")
-        # --- GRACEFUL FAILURE ---
-        return {"company_name": self.company_name or "Unknown", "reviews": []}
+                except Exception as e:
+                    log.error(f"Attempt {attempt + 1} failed: {e}", exc_info=True)
+                    # Only relaunch Chrome if the browser itself broke; page-level errors just reload the URL
+                    if self._is_browser_failure(e):
+                        self._quit_driver()
+                    if attempt < 2: time.sleep(5)
+            
+            log.error("All scraping attempts have failed.")
+            # --- GRACEFUL FAILURE ---
+            return {"company_name": self.company_name or "Unknown", "reviews": []}
+        finally:
+            self._release_driver()
+
+    def _is_browser_failure(self, e: Exception) -> bool:
+        """True if the error left the browser/session unusable (as opposed to a page-level failure)."""
+        if isinstance(e, (InvalidSessionIdException, NoSuchWindowException, SessionNotCreatedException)):
+            return True
+        # Most Selenium errors (intercepted clicks, script errors, timeouts) are page-level,
+        # so anything else only counts if the session has stopped responding
+        return self.driver is not None and not is_alive(self.driver)
 
     def _scroll_and_extract_reviews(self, pane: WebElement, job_info: dict) -> (dict, set):
         """Handles scrolling and sets progress from 60% to 90%."""
         docs, seen = {}, set()
         idle_scrolls = 0
+        # Resolve every "N days ago" in this scrape against one timestamp
+        now = datetime.now(timezone.utc)
         
         while idle_scrolls < 5:
-            cards = pane.find_elements(By.CSS_SELECTOR, CARD_SEL)
+            # Expand and read all new cards in the browser, then parse their HTML locally
+            seen_ids = list(seen)
+            self.driver.execute_script(EXPAND_JS, pane, seen_ids, CARD_SEL, RawReview.MORE_BTN)
+            cards = self.driver.execute_script(EXTRACT_JS, pane, seen_ids, CARD_SEL)
             new_reviews_in_pass = 0
             for card in cards:
-                try:
-                    review_id = card.get_attribute("data-review-id")
-                    if not review_id or review_id in seen:
-                        continue
-                    
-                    raw_review = RawReview.from_card(card)
-                    raw_review.company_name = self.company_name
-                    docs[raw_review.id] = raw_review
-                    seen.add(raw_review.id)
-                    new_reviews_in_pass += 1
-
-                    if job_info:
-                        progress_for_reviews = min(len(docs) / 150.0, 1.0) * 30
-                        job_info['progress']['percentage'] = 60 + int(progress_for_reviews)
-                        job_info['progress']['message'] = f"Scraping reviews ({len(docs)} found)..."
-                except StaleElementReferenceException:
-                    continue
+                raw_review = RawReview.from_card_html(card["html"], now)
+                raw_review.company_name = self.company_name
+                docs[raw_review.id] = raw_review
+                seen.add(raw_review.id)
+                new_reviews_in_pass += 1
+
+                if job_info:
+                    progress_for_reviews = min(len(docs) / 150.0, 1.0) * 30
+                    job_info['progress']['percentage'] = 60 + int(progress_for_reviews)
+                    job_info['progress']['message'] = f"Scraping reviews ({len(docs)} found)..."
             
             if new_reviews_in_pass == 0:
                 idle_scrolls += 1
             else:
                 idle_scrolls = 0
 
+            last_count = self.driver.execute_script(COUNT_JS, pane, CARD_SEL)
             self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", pane)
-            time.sleep(1.5)
+            try:
+                WebDriverWait(self.driver, SCROLL_WAIT, poll_frequency=SCROLL_POLL).until(
+                    lambda d: d.execute_script(COUNT_JS, pane, CARD_SEL) > last_count
+                )
+            except TimeoutException:
+                pass  # Nothing new loaded; the next pass will count as an idle scroll
         
         return docs, seen
 
     def dismiss_cookies(self, driver: Chrome):
         try:
-            cookie_button = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.CSS_SELECTOR, COOKIE_BTN)))
+            cookie_button = WebDriverWait(driver, 3, poll_frequency=WAIT_POLL).until(EC.element_to_be_clickable(COOKIE_LOCATOR))
             cookie_button.click()
             log.info("Cookie dialog dismissed.")
         except TimeoutException:
@@ -177,7 +257,7 @@ class GoogleReviewsScraper:
         
         for selector in selectors:
             try:
-                elements = WebDriverWait(driver, 5).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector)))
+                elements = WebDriverWait(driver, 5, poll_frequency=WAIT_POLL).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector)))
                 for element in elements:
                     if self.is_reviews_tab(element):
                         element.click()
@@ -196,7 +276,7 @@ class GoogleReviewsScraper:
             log.info("Using default 'relevance' sort.")
             return
         try:
-            sort_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, SORT_BTN)))
+            sort_button = WebDriverWait(driver, 10, poll_frequency=WAIT_POLL).until(EC.element_to_be_clickable(SORT_LOCATOR))
             sort_button.click()
             time.sleep(1)
             
@@ -214,23 +294,24 @@ class GoogleReviewsScraper:
             job_info['progress']['percentage'] = 25
             job_info['progress']['message'] = "Searching for company name..."
         try:
-            for selector in COMPANY_NAME_SELECTORS:
-                try:
-                    name_element = WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    name = name_element.text.strip()
-                    if name:
-                        if job_info: 
-                            job_info['progress']['percentage'] = 40
-                            job_info['progress']['message'] = f"✅ Found company: {name}"
-                        time.sleep(1)
-                        return name
-                except TimeoutException:
-                    continue
-            
-            title = driver.title
-            if " - Google Maps" in title:
-                return title.split(" - Google Maps")[0].strip()
-            return "Unknown Company"
+            # The browser watches the DOM for the name itself, so there is no polling from Python
+            name = driver.execute_async_script(WAIT_TEXT_JS, COMPANY_NAME_SEL, int(COMPANY_NAME_WAIT * 1000))
+        except Exception as e:
+            log.warning(f"Company name lookup failed, using the page title: {e}")
+            name = None
+        if not name:
+            # No visible name within the wait, so use the page title
+            return self._company_name_from_title(driver)
+
+        if job_info: 
+            job_info['progress']['percentage'] = 40
+            job_info['progress']['message'] = f"✅ Found company: {name}"
+        return name
+
+    @staticmethod
+    def _company_name_from_title(driver: Chrome) -> str:
+        try:
+            return driver.title.removesuffix(" - Google Maps").strip() or "Unknown Company"
         except Exception as e:
             log.error(f"Error finding company name: {e}")
             return "Unknown Company"
@@ -4,17 +4,13 @@ Utility functions for Google Maps Reviews Scraper.
 import datetime
 import logging
 import re
-import time
 from datetime import timezone
-from functools import lru_cache
-from typing import List
+from functools import cache, lru_cache
 
-from selenium.common.exceptions import (NoSuchElementException,
-                                        StaleElementReferenceException,
-                                        TimeoutException)
+from bs4 import Comment, NavigableString, Tag
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver import Chrome
 from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
@@ -24,103 +20,157 @@ log = logging.getLogger("scraper")
 # Constants for language detection
 HEB_CHARS = re.compile(r"[\u0590-\u05FF]")
 THAI_CHARS = re.compile(r"[\u0E00-\u0E7F]")
+# Both ranges in one pattern; the group names are the language codes detect_lang returns
+_LANG_RE = re.compile(r"(?P<he>[\u0590-\u05FF])|(?P<th>[\u0E00-\u0E7F])")
+
+# Digit runs in mixed labels like "Like 12"; thousands separators are dropped before matching
+_DIGIT_RUN = re.compile(r"\d+")
+_NO_THOUSANDS = str.maketrans("", "", ",")
+
+# Poll interval for short element waits; Selenium's default of 0.5s adds up to half a second to each one
+WAIT_POLL = 0.05
+
+# Inline styles that keep an element out of the rendered text (WebElement.text returns "" for these)
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
+
+# Bound once for the element waits below
+_CSS = By.CSS_SELECTOR
+
+# Clicks the first visible, enabled element matching arguments[0]; returns null if nothing matches at all
+CLICK_VISIBLE_JS = """
+const els = document.querySelectorAll(arguments[0]);
+if (!els.length) return null;
+for (const e of els) {
+  const s = getComputedStyle(e);
+  if (s.visibility !== 'hidden' && s.display !== 'none' && !e.disabled) { e.click(); return true; }
+}
+return false;
+"""
+
+# Relative dates ("3 weeks ago", "a month ago") and the length of each unit
+_AGO_RE = re.compile(r'(\d+)?\s*(minute|hour|day|week|month|year)s?\s+ago')
+_UNIT = {
+    'minute': datetime.timedelta(minutes=1),
+    'hour': datetime.timedelta(hours=1),
+    'day': datetime.timedelta(days=1),
+    'week': datetime.timedelta(weeks=1),
+    'month': datetime.timedelta(days=30),  # Approximation
+    'year': datetime.timedelta(days=365),  # Approximation
+}
 
 
+# Keyed on whole review texts, which never stop arriving in the long-running backend, so stays bounded
 @lru_cache(maxsize=1024)
 def detect_lang(txt: str) -> str:
     """Detect language based on character sets"""
-    if HEB_CHARS.search(txt):  return "he"
-    if THAI_CHARS.search(txt): return "th"
-    return "en"
+    if txt.isascii():  # Most reviews: no Hebrew/Thai possible, skip the regex
+        return "en"
+    m = _LANG_RE.search(txt)
+    return m.lastgroup if m else "en"
 
 
-@lru_cache(maxsize=128)
+# Inputs are short count labels (like-button text such as "3") with few distinct values
+@cache
 def safe_int(s: str | None) -> int:
     """Safely convert string to integer, returning 0 if not possible"""
-    m = re.search(r"\d+", s or "")
+    if not s:
+        return 0
+    s = s.translate(_NO_THOUSANDS)
+    if s.isdecimal():  # Plain counts need no regex (isdigit would also pass "²", which int() rejects)
+        return int(s)
+    m = _DIGIT_RUN.search(s)
     return int(m.group()) if m else 0
 
 
-def try_find(el: WebElement, css: str, *, all=False) -> List[WebElement]:
-    """Safely find elements by CSS selector without raising exceptions"""
-    try:
-        if all:
-            return el.find_elements(By.CSS_SELECTOR, css)
-        obj = el.find_element(By.CSS_SELECTOR, css)
-        return [obj] if obj else []
-    except (NoSuchElementException, StaleElementReferenceException):
-        return []
+def _html_hidden(tag: Tag) -> bool:
+    """True if the tag is hidden by its own `hidden` attribute or inline style"""
+    return tag.has_attr("hidden") or bool(_HIDDEN_STYLE.search(tag.get("style") or ""))
 
 
-def first_text(el: WebElement, css: str) -> str:
-    """Get text from the first matching element that has non-empty text"""
-    for e in try_find(el, css, all=True):
-        try:
-            if (t := e.text.strip()):
-                return t
-        except StaleElementReferenceException:
-            continue
+def _html_visible(tag: Tag, root: Tag) -> bool:
+    """True unless the tag or one of its ancestors up to `root` is hidden"""
+    while tag is not None:
+        if _html_hidden(tag):
+            return False
+        if tag is root:
+            break
+        tag = tag.parent
+    return True
+
+
+def html_text(node: Tag) -> str:
+    """
+    Get the text of parsed HTML the way the browser renders it:
+    <br> becomes a newline, and hidden elements, scripts and comments are skipped.
+    """
+    parts = []
+
+    def walk(tag: Tag):
+        for child in tag.children:
+            if isinstance(child, Tag):
+                if child.name == "br":
+                    parts.append("\n")
+                elif child.name not in ("script", "style") and not _html_hidden(child):
+                    walk(child)
+            elif isinstance(child, NavigableString) and not isinstance(child, Comment):
+                parts.append(child)
+
+    walk(node)
+    return "".join(parts)
+
+
+def html_first_text(node: Tag, css: str) -> str:
+    """Get text from the first visible matching element in parsed HTML that has non-empty text"""
+    for e in node.select(css):
+        if _html_visible(e, node) and (t := html_text(e).strip()):
+            return t
     return ""
 
-def first_attr(el: WebElement, css: str, attr: str) -> str:
-    """Get attribute value from the first matching element that has a non-empty value"""
-    for e in try_find(el, css, all=True):
-        try:
-            if (v := (e.get_attribute(attr) or "").strip()):
-                return v
-        except StaleElementReferenceException:
-            continue
+
+def html_first_attr(node: Tag, css: str, attr: str) -> str:
+    """Get attribute value from the first matching element in parsed HTML that has a non-empty value"""
+    for e in node.select(css):
+        if (v := (e.get(attr) or "").strip()):
+            return v
     return ""
 
 
-def parse_date_to_iso(date_str: str) -> str:
+def parse_date_to_iso(date_str: str, now: datetime.datetime | None = None) -> str:
     """
     Parse date strings like "2 weeks ago", "January 2023", etc. into ISO format.
     Returns a best-effort ISO string, or empty string if parsing fails.
+    Pass `now` to resolve a whole batch of relative dates against the same time.
     """
     if not date_str:
         return ""
 
     try:
-        now = datetime.datetime.now(timezone.utc)
-        date_str = date_str.lower()
+        now = now or datetime.datetime.now(timezone.utc)
         dt = now # Default to now
 
-        if "ago" in date_str:
-            num = int(re.search(r'\d+', date_str).group()) if re.search(r'\d+', date_str) else 1
-            if "minute" in date_str: dt = now - datetime.timedelta(minutes=num)
-            elif "hour" in date_str: dt = now - datetime.timedelta(hours=num)
-            elif "day" in date_str: dt = now - datetime.timedelta(days=num)
-            elif "week" in date_str: dt = now - datetime.timedelta(weeks=num)
-            elif "month" in date_str: dt = now - datetime.timedelta(days=30 * num) # Approximation
-            elif "year" in date_str: dt = now - datetime.timedelta(days=365 * num) # Approximation
-        
-        return dt.replace(microsecond=0).isoformat()
+        if (m := _AGO_RE.search(date_str.lower())):
+            num = int(m.group(1) or 1)
+            dt = now - _UNIT[m.group(2)] * num
+
+        return dt.isoformat(timespec='seconds')
     except Exception:
         return ""
 
 
-def click_if(driver: Chrome, css: str, delay: float = .25, timeout: float = 5.0) -> bool:
+def click_if(driver: Chrome, css: str, timeout: float = 5.0) -> bool:
     """Click element if it exists and is clickable, with timeout and better error handling."""
     try:
-        elements = driver.find_elements(By.CSS_SELECTOR, css)
-        if not elements:
+        # Find and click the first visible, enabled match in a single browser round-trip
+        clicked = driver.execute_script(CLICK_VISIBLE_JS, css)
+        if clicked is None:
             return False
-
-        for element in elements:
-            try:
-                if element.is_displayed() and element.is_enabled():
-                    element.click()
-                    time.sleep(delay)
-                    return True
-            except Exception:
-                continue
+        if clicked:
+            return True
 
         try:
-            WebDriverWait(driver, timeout).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, css))
+            WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL).until(
+                EC.element_to_be_clickable((_CSS, css))
             ).click()
-            time.sleep(delay)
             return True
         except TimeoutException:
             return False
@@ -8,7 +8,7 @@ Main entry point for the scraper.
 
 import sys
 from modules.cli import parse_arguments
-from modules.config import load_config
+from modules.config import load_config, thaw_config
 from modules.scraper import GoogleReviewsScraper
 
 
@@ -18,7 +18,7 @@ def main():
     args = parse_arguments()
 
     # Load configuration
-    config = load_config(args.config)
+    config = thaw_config(load_config(args.config))
 
     # Override config with command line arguments if provided
     if args.headless:
@@ -1,17 +1,28 @@
-from flask import Flask, request, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
-import uuid
-import threading
+from celery import Celery
+from celery.result import AsyncResult
+import redis
 import time
 
-# A clean, simple dictionary for our test jobs
-jobs = {}
+# Jobs run in Celery workers and their state lives in Redis, so it survives restarts.
+# Start a worker with: celery -A test_app worker --concurrency=2
+# (set --concurrency to the number of Chrome instances the host can run)
+celery = Celery('scraper', broker='redis://localhost:6379/0', backend='redis://localhost:6379/1')
+celery.conf.task_track_started = True
+# Celery reports unknown task ids as PENDING, so remember the ids we issued for as long as results are kept
+JOB_IDS = redis.Redis.from_url('redis://localhost:6379/1')
+JOB_TTL = int(celery.conf.result_expires.total_seconds())
 
-def a_slow_background_task(job_id):
+# Celery task states mapped onto the job statuses the frontend polls for
+STATUS = {'PENDING': 'running', 'STARTED': 'running', 'RETRY': 'running', 'SUCCESS': 'complete'}
+
+@celery.task(bind=True)
+def scrape_task(self):
     """
-    This function ONLY simulates a delay. It proves the threading concept.
+    This function ONLY simulates a delay. It proves the background worker concept.
     """
-    print(f"BACKGROUND TASK: Starting 10-second wait for job {job_id}.")
+    print(f"BACKGROUND TASK: Starting 10-second wait for job {self.request.id}.")
     time.sleep(10)
     
     # When the wait is over, create some fake result data
@@ -20,10 +31,8 @@ def a_slow_background_task(job_id):
         "reviews": [{"author_name": "Success!", "rating": 5, "text": "The background task worked!", "prediction": "Real"}]
     }
     
-    # Update the job status
-    jobs[job_id]['status'] = 'complete'
-    jobs[job_id]['result'] = result_data
-    print(f"BACKGROUND TASK: Job {job_id} is now complete.")
+    print(f"BACKGROUND TASK: Job {self.request.id} is now complete.")
+    return result_data
 
 # --- Flask App Setup ---
 app = Flask(__name__)
@@ -31,24 +40,28 @@ CORS(app)
 
 @app.route('/detect', methods=['POST'])
 def detect_start():
-    job_id = str(uuid.uuid4())
-    jobs[job_id] = {'status': 'running', 'result': None}
-
-    # Start the slow task in the background
-    thread = threading.Thread(target=a_slow_background_task, args=(job_id,))
-    thread.start()
+    # Queue the slow task for a worker
+    task = scrape_task.delay()
+    JOB_IDS.set(f"job:{task.id}", 1, ex=JOB_TTL)
 
     # IMMEDIATELY return the job_id
-    print(f"IMMEDIATE RESPONSE: Sent job_id {job_id} to the browser.")
-    return jsonify({"job_id": job_id}), 202
+    print(f"IMMEDIATE RESPONSE: Sent job_id {task.id} to the browser.")
+    return jsonify({"job_id": task.id}), 202
 
 @app.route('/results/<job_id>', methods=['GET'])
 def get_results(job_id):
-    job = jobs.get(job_id)
     print(f"POLLING CHECK: Browser is asking for status of job {job_id}.")
-    return jsonify(job)
+    if not JOB_IDS.exists(f"job:{job_id}"):
+        return jsonify({'error': 'Job not found'}), 404
+    task = AsyncResult(job_id, app=celery)
+    status = STATUS.get(task.state, 'error')
+    result = task.result if status == 'complete' else None
+    return jsonify({'status': status, 'result': result})
 
 if __name__ == '__main__':
+    # Serve with: gunicorn -k gevent -w 4 --worker-connections 100 -b 127.0.0.1:5001 test_app:app
+    # The gevent worker class monkey-patches on its own; the module stays unpatched so the
+    # Celery worker above can keep using its default prefork pool.
     # Make sure your main server is not running on port 5000
     # We will run this test on port 5001 to be safe
-    app.run(port=5001, debug=True, threaded=True)
\ No newline at end of file
+    app.run(port=5001, threaded=True)
@@ -0,0 +1,88 @@
+"""
+Test parsing of review cards from their HTML.
+"""
+
+from datetime import datetime, timezone
+
+from modules.models import RawReview
+
+NOW = datetime(2025, 6, 15, 12, 30, 45, 123456, tzinfo=timezone.utc)
+
+CARD_HTML = """
+<div data-review-id="abc123">
+  <button data-review-id="abc123" data-href="https://www.google.com/maps/contrib/42">
+    <img src="https://lh3.googleusercontent.com/avatar.jpg">
+  </button>
+  <div class="d4r55 fontTitleSmall"> Jane Doe </div>
+  <span role="img" aria-label="4,0 stars"></span>
+  <span class="rsqaWe">2 weeks ago</span>
+  <span jsname="bN97Pc"></span>
+  <div class="MyEned"><span class="wiI7pd">Great coffee, friendly staff.</span></div>
+  <button jsaction="pane.review.toggleThumbsUp" aria-label="Like">3</button>
+  <button class="Tya61d" style='background-image: url("https://example.com/p1.jpg");'></button>
+  <button class="Tya61d" style='background-image: url("https://example.com/p2.jpg");'></button>
+  <div class="CDe7pd">
+    <span class="DZSIDd">a week ago</span>
+    <div class="wiI7pd">Thanks for visiting!</div>
+  </div>
+</div>
+"""
+
+
+class TestRawReviewFromCardHtml:
+    """Test RawReview.from_card_html field extraction"""
+
+    def test_extracts_all_fields(self):
+        """Test every field is read from a complete review card"""
+        review = RawReview.from_card_html(CARD_HTML, NOW)
+
+        assert review.id == "abc123"
+        assert review.author == "Jane Doe"
+        assert review.profile == "https://www.google.com/maps/contrib/42"
+        assert review.avatar == "https://lh3.googleusercontent.com/avatar.jpg"
+        assert review.rating == 4.0
+        assert review.date == "2 weeks ago"
+        assert review.review_date == "2025-06-01T12:30:45+00:00"
+        assert review.text == "Great coffee, friendly staff."
+        assert review.lang == "en"
+        assert review.likes == 3
+        assert review.photos == ["https://example.com/p1.jpg", "https://example.com/p2.jpg"]
+        assert review.owner_date == "a week ago"
+        assert review.owner_text == "Thanks for visiting!"
+
+    def test_missing_fields_use_defaults(self):
+        """Test a card with only an id falls back to empty/zero values"""
+        review = RawReview.from_card_html('<div data-review-id="x"></div>', NOW)
+
+        assert review.id == "x"
+        assert review.author == ""
+        assert review.rating == 0.0
+        assert review.review_date == ""
+        assert review.likes == 0
+        assert review.photos == []
+        assert review.owner_text == ""
+
+    def test_line_breaks_kept_in_text(self):
+        """Test <br> tags become newlines, as in the rendered review text"""
+        html = """
+        <div data-review-id="x">
+          <div class="MyEned"><span class="wiI7pd">Great food.<br>Friendly staff.<br><br>Will return!</span></div>
+        </div>
+        """
+        review = RawReview.from_card_html(html, NOW)
+
+        assert review.text == "Great food.\nFriendly staff.\n\nWill return!"
+
+    def test_hidden_elements_skipped(self):
+        """Test a hidden match doesn't win over a visible one, and hidden children add no text"""
+        html = """
+        <div data-review-id="x">
+          <span jsname="bN97Pc" style="display: none">Truncated...</span>
+          <div class="MyEned"><span class="wiI7pd">Full review<span hidden> (hidden)</span></span></div>
+          <div class="d4r55" style="visibility:hidden">Ghost</div>
+        </div>
+        """
+        review = RawReview.from_card_html(html, NOW)
+
+        assert review.text == "Full review"
+        assert review.author == ""
@@ -0,0 +1,54 @@
+"""
+Test date and number parsing helpers.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from modules.utils import parse_date_to_iso, safe_int
+
+NOW = datetime(2025, 6, 15, 12, 30, 45, 123456, tzinfo=timezone.utc)
+
+
+class TestParseDateToIso:
+    """Test relative date parsing"""
+
+    @pytest.mark.parametrize("date_str, expected", [
+        ("3 days ago", "2025-06-12T12:30:45+00:00"),
+        ("a week ago", "2025-06-08T12:30:45+00:00"),
+        ("2 months ago", "2025-04-16T12:30:45+00:00"),
+        ("5 hours ago", "2025-06-15T07:30:45+00:00"),
+        ("Edited a year ago", "2024-06-15T12:30:45+00:00"),
+        ("January 2023", "2025-06-15T12:30:45+00:00"),  # Unparsed dates default to now
+    ])
+    def test_relative_dates(self, date_str, expected):
+        """Test relative dates resolve against the given time, to the second"""
+        assert parse_date_to_iso(date_str, NOW) == expected
+
+    def test_empty_string(self):
+        """Test an empty date gives an empty string"""
+        assert parse_date_to_iso("", NOW) == ""
+
+    def test_defaults_to_current_time(self):
+        """Test dates resolve against the current UTC time when no time is given"""
+        parsed = datetime.fromisoformat(parse_date_to_iso("1 day ago"))
+        age = datetime.now(timezone.utc) - parsed
+        assert 86398 <= age.total_seconds() <= 86402
+
+
+class TestSafeInt:
+    """Test integer extraction from labels"""
+
+    @pytest.mark.parametrize("value, expected", [
+        (None, 0),
+        ("", 0),
+        ("12", 12),
+        ("1,234", 1234),
+        ("Like 3", 3),
+        ("no digits", 0),
+        ("²", 0),
+    ])
+    def test_values(self, value, expected):
+        """Test plain, mixed and invalid inputs"""
+        assert safe_int(value) == expected
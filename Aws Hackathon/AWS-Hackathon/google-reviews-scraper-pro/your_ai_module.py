@@ -1,21 +1,18 @@
 import re
 
+SUSPICIOUS_PHRASES = [
+    "out of this world",
+    "amazing experience",
+    "free drink",
+    "promotion",
+    "coupon"
+]
+# All phrases in one case-insensitive alternation, so reviews are matched without a lowercased copy
+_SUSPICIOUS = re.compile(r'\b(?:' + '|'.join(map(re.escape, SUSPICIOUS_PHRASES)) + r')\b', re.IGNORECASE)
+
 def detect_fake_review(review_text):
     """
     A simple function to simulate AI-based fake review detection.
     This is for local testing only.
     """
-    review_text_lower = review_text.lower()
-    suspicious_phrases = [
-        "out of this world",
-        "amazing experience",
-        "free drink",
-        "promotion",
-        "coupon"
-    ]
-    
-    for phrase in suspicious_phrases:
-        if re.search(r'\b' + re.escape(phrase) + r'\b', review_text_lower):
-            return "Fake"
-            
-    return "Genuine"
\ No newline at end of file
+    return "Fake" if _SUSPICIOUS.search(review_text) else "Genuine"
\ No newline at end of file